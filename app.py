@@ -3,8 +3,18 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import hashlib
+import os
+import tempfile
 from datetime import datetime, timedelta
 
+# Optional Rust-based Excel reader (much faster than openpyxl when installed)
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
 # ---------------------------------------------------------
 # 1. PAGE CONFIGURATION & DARK THEME
 # ---------------------------------------------------------
@@ -47,6 +57,71 @@ st.markdown("""
 # ---------------------------------------------------------
 # 2. DATA PROCESSING FUNCTION
 # ---------------------------------------------------------
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# Parquet copies kept on disk; the least recently used ones are removed beyond this
+CACHE_MAX_FILES = 20
+
+# Internal derived column: never clashes with an uploaded 'Tweet_Length' and is
+# left out of the raw data table and CSV export
+LENGTH_COL = '_Tweet_Length'
+
+
+def prune_cache_dir():
+    """
+    Removes the least recently used Parquet copies beyond CACHE_MAX_FILES.
+    """
+    try:
+        entries = [
+            os.path.join(CACHE_DIR, name) for name in os.listdir(CACHE_DIR)
+            if name.endswith('.parquet')
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[CACHE_MAX_FILES:]:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def load_excel_cached(uploaded_file):
+    """
+    Reads the uploaded Excel file, converting it once to a Parquet
+    copy (keyed by file hash) so later runs skip the slow XLSX parse.
+    """
+    file_hash = hashlib.md5(uploaded_file.getbuffer(), usedforsecurity=False).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{file_hash}.parquet")
+
+    if os.path.exists(cache_path):
+        try:
+            df = pd.read_parquet(cache_path, engine='pyarrow')
+            # Mark as recently used so pruning keeps it
+            os.utime(cache_path)
+            return df
+        except Exception:
+            # Unreadable cache file (e.g. truncated): drop it and re-parse the Excel
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+
+    df = pd.read_excel(uploaded_file, engine=EXCEL_ENGINE)
+
+    # Caching is best-effort: mixed-type columns may not convert to Parquet.
+    # Write to a temp file and rename it into place so readers never see a partial file.
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.parquet.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+        os.replace(tmp_path, cache_path)
+        prune_cache_dir()
+    except Exception:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return df
+
+
 @st.cache_data
 def process_data(uploaded_file):
     """
@@ -54,11 +129,11 @@ def process_data(uploaded_file):
     to match the dashboard structure.
     """
     try:
-        df = pd.read_excel(uploaded_file)
+        df = load_excel_cached(uploaded_file)
         
-        # 1. Tweet IDs (Random ID generation)
+        # 1. Tweet IDs (Sequential placeholder IDs, unique per row)
         if 'Tweet_ID' not in df.columns:
-            df['Tweet_ID'] = np.random.randint(1000000, 9999999, size=len(df))
+            df['Tweet_ID'] = np.arange(len(df), dtype=np.int64)
             
         # 2. Authors (Random Author assignment)
         if 'Author_ID' not in df.columns:
@@ -68,12 +143,15 @@ def process_data(uploaded_file):
             
         # 3. Dates (Simulate last 30 days if no date column)
         if 'Date' not in df.columns:
-            start_date = datetime.now() - timedelta(days=30)
-            df['Date'] = [
-                start_date + timedelta(days=np.random.randint(0, 30),
-                                       hours=np.random.randint(0, 23))
-                for _ in range(len(df))
-            ]
+            n = len(df)
+            start_date = np.datetime64(datetime.now() - timedelta(days=30))
+            days = np.random.randint(0, 30, size=n, dtype='i4')
+            hours = np.random.randint(0, 23, size=n, dtype='i4')
+            df['Date'] = (
+                start_date
+                + days * np.timedelta64(1, 'D')
+                + hours * np.timedelta64(1, 'h')
+            )
         else:
             df['Date'] = pd.to_datetime(df['Date'])
 
@@ -87,12 +165,383 @@ def process_data(uploaded_file):
         if 'Emoji' not in df.columns:
             df['Emoji'] = "🙂"
 
+        # 5. Compact dtypes: low-cardinality labels as categories, text as strings
+        for col in ['Festival', 'Sentiment', 'Emotion', 'Emoji', 'Author_ID']:
+            if col in df.columns:
+                # Mixed-type labels (e.g. '🎉' and 1) become strings so the categories
+                # share one type and stay Arrow-serialisable; NaN stays NaN
+                if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+                    df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+                df[col] = df[col].astype('category')
+        df['Tweet_Text'] = df['Tweet_Text'].astype('string[pyarrow]')
+
+        # 6. Tweet length, computed once per file by the Arrow string kernel
+        #    (nullable Int32: missing text stays missing instead of counting as 0)
+        df[LENGTH_COL] = df['Tweet_Text'].str.len().astype('Int32')
+
         return df
         
     except Exception as e:
         st.error(f"Error processing file: {e}")
         return pd.DataFrame()
 
+
+# Rows sent to the raw data table; the full set is available via CSV download
+RAW_PREVIEW_ROWS = 1000
+
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df, columns):
+    return df.to_csv(index=False, columns=columns).encode('utf-8')
+
+# ---------------------------------------------------------
+# 2B. CHART BUILDERS (cached on their aggregated inputs)
+# ---------------------------------------------------------
+# Shared dark/transparent chart styling. Kept as explicit layout values rather
+# than a plotly template: st.plotly_chart's default theme replaces the template.
+NEON_LAYOUT = dict(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='white')
+)
+
+
+@st.cache_data(show_spinner=False)
+def build_emoji_bar(emoji_counts):
+    fig = px.bar(
+        emoji_counts,
+        x='Count',
+        y='Emoji',
+        orientation='h',
+        text='Count',
+        color='Count',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_sentiment_pie(sent_counts):
+    fig = px.pie(
+        sent_counts,
+        names='Sentiment',
+        values='Count',
+        hole=0.5,
+        color_discrete_sequence=px.colors.qualitative.Bold
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_emotion_treemap(tree_df):
+    fig = px.treemap(
+        tree_df,
+        path=['Emotion', 'Emoji'],
+        values='Count',
+        color='Emotion'
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_trend_line(daily):
+    fig = px.line(
+        daily,
+        x='Date',
+        y='Tweets',
+        markers=True,
+        line_shape='spline'
+    )
+    fig.update_traces(line_color='#F472B6', line_width=3)
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_emoji_sentiment_bar(emoji_sent_top):
+    fig = px.bar(
+        emoji_sent_top,
+        x='Emoji',
+        y='Count',
+        color='Sentiment',
+        barmode='group'
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_length_violin(length_df):
+    # Tweets without text have no length to plot
+    length_df = length_df.dropna(subset=['Tweet_Length']).astype({'Tweet_Length': 'int32'})
+
+    # Cap the rows sent per sentiment so the figure JSON stays small
+    shuffled = length_df.sample(frac=1, random_state=0)
+    violin_df = shuffled[shuffled.groupby('Sentiment', observed=True).cumcount() < 2000]
+
+    fig = px.violin(
+        violin_df,
+        x='Sentiment',
+        y='Tweet_Length',
+        color='Sentiment',
+        box=True,
+        points='outliers'
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_activity_scatter(scat_agg):
+    fig = px.scatter(
+        scat_agg,
+        x='Date_only',
+        y='Emoji',
+        size='Count',
+        color='Sentiment' if 'Sentiment' in scat_agg.columns else None,
+        size_max=12,
+        render_mode='webgl'
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_length_radar(agg_radar):
+    fig = px.line_polar(
+        agg_radar,
+        r='Tweet_Length',
+        theta='Sentiment',
+        line_close=True
+    )
+    fig.update_traces(fill='toself')
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True)
+        ),
+        showlegend=False,
+        **NEON_LAYOUT
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_sentiment_area(area_agg):
+    fig = px.area(
+        area_agg,
+        x='Date_only',
+        y='Tweets',
+        color='Sentiment',
+        line_group='Sentiment',
+        groupnorm=None
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_positive_gauge(positive_rate):
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=positive_rate,
+            title={'text': "Positive Tweets (%)"},
+            domain={'x': [0, 1], 'y': [0, 1]},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "#8B5CF6"},
+                "steps": [
+                    {"range": [0, 30], "color": "#DC2626"},
+                    {"range": [30, 60], "color": "#F59E0B"},
+                    {"range": [60, 100], "color": "#16A34A"},
+                ],
+                "threshold": {
+                    "line": {"color": "white", "width": 4},
+                    "thickness": 0.75,
+                    "value": positive_rate,
+                },
+            },
+        )
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_sankey(sankey_counts, top_emojis):
+    """
+    Festival -> Sentiment -> Emoji flow. Returns None when there are no links.
+    """
+    festivals = sankey_counts['Festival'].dropna().unique().tolist()
+    sentiments = sankey_counts['Sentiment'].dropna().unique().tolist()
+    emojis = list(top_emojis)
+
+    # Node index over the union of labels (a label shared by two groups is one node)
+    labels = pd.Index(festivals + sentiments + emojis).unique()
+
+    # Links: Festival -> Sentiment
+    fs = (
+        sankey_counts
+        .groupby(['Festival', 'Sentiment'], observed=True)['Count']
+        .sum()
+        .reset_index(name='Count')
+    )
+    # Links: Sentiment -> Emoji
+    se = (
+        sankey_counts
+        .groupby(['Sentiment', 'Emoji'], observed=True)['Count']
+        .sum()
+        .reset_index(name='Count')
+    )
+
+    # F → S, then S → E as integer node codes (-1 = label not in the node list)
+    sources = np.concatenate([
+        labels.get_indexer(fs['Festival']),
+        labels.get_indexer(se['Sentiment'])
+    ])
+    targets = np.concatenate([
+        labels.get_indexer(fs['Sentiment']),
+        labels.get_indexer(se['Emoji'])
+    ])
+    values = np.concatenate([fs['Count'].to_numpy(), se['Count'].to_numpy()])
+
+    valid = (sources >= 0) & (targets >= 0)
+    sources = sources[valid]
+    targets = targets[valid]
+    values = values[valid]
+
+    if len(sources) == 0:
+        return None
+
+    fig = go.Figure(
+        go.Sankey(
+            node=dict(
+                label=labels.tolist(),
+                pad=15,
+                thickness=20,
+                color="#4B5563"
+            ),
+            link=dict(
+                source=sources,
+                target=targets,
+                value=values,
+                color="rgba(139,92,246,0.5)"
+            )
+        )
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+# Co-occurrence counts: tweet i owns emoji codes codes[offsets[i]:offsets[i + 1]]
+# (unique within a tweet, negative = not tracked); out[a, b] = tweets using both.
+def cooccurrence_counts_loop(codes, offsets, k):
+    out = np.zeros((k, k), dtype=np.int64)
+    for i in range(len(offsets) - 1):
+        row = codes[offsets[i]:offsets[i + 1]]
+        for a in row:
+            if a < 0:
+                continue
+            for b in row:
+                if b >= 0:
+                    out[a, b] += 1
+    return out
+
+
+def cooccurrence_counts_numpy(codes, offsets, k):
+    tweet_idx = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    keep = codes >= 0
+    occ = np.zeros((len(offsets) - 1, k), dtype=np.float32)
+    occ[tweet_idx[keep], codes[keep]] = 1
+    return np.rint(occ.T @ occ).astype(np.int64)
+
+
+@st.cache_resource(show_spinner=False)
+def load_cooccurrence_kernel():
+    """
+    numba-compiled loop when numba is installed (imported on first use
+    only, it is slow to import), otherwise the NumPy implementation.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return cooccurrence_counts_numpy
+    return njit(cooccurrence_counts_loop)
+
+
+def cooccurrence_corr(counts, n_tweets):
+    """
+    Pearson correlation of the binary tweet-emoji occurrence vectors,
+    computed from the co-occurrence counts (NaN for constant columns).
+    """
+    used = np.diag(counts).astype(float)
+    cov = n_tweets * counts - np.outer(used, used)
+    var = used * (n_tweets - used)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / np.sqrt(np.outer(var, var))
+
+
+@st.cache_data(show_spinner=False)
+def build_cooccurrence_heatmap(emoji_series, top_emojis):
+    top_emojis = list(top_emojis)
+
+    # Emoji codes per tweet (here exactly one per tweet, but generic structure).
+    codes = pd.Index(top_emojis).get_indexer(emoji_series).astype(np.int64)
+    offsets = np.arange(len(codes) + 1, dtype=np.int64)
+
+    counts = load_cooccurrence_kernel()(codes, offsets, len(top_emojis))
+    corr_mat = cooccurrence_corr(counts, len(codes))
+
+    fig = px.imshow(
+        corr_mat,
+        x=top_emojis,
+        y=top_emojis,
+        color_continuous_scale="PuRd",
+        zmin=-1,
+        zmax=1
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_emoji_bubble(agg_anim):
+    fig = px.scatter(
+        agg_anim,
+        x='Date_only',
+        y='Emoji',
+        size='Count',
+        color='Emoji',
+        animation_frame='Date_only',
+        size_max=20
+    )
+    fig.update_layout(
+        updatemenus=[dict(bgcolor="#111827")],
+        **NEON_LAYOUT
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def build_calendar_heatmap(cal_agg):
+    fig = px.density_heatmap(
+        cal_agg,
+        x='week',
+        y='dow',
+        z='Tweets',
+        color_continuous_scale="Greens"
+    )
+    fig.update_yaxes(
+        tickmode='array',
+        tickvals=[0, 1, 2, 3, 4, 5, 6],
+        ticktext=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    )
+    fig.update_layout(**NEON_LAYOUT)
+    return fig
+
 # ---------------------------------------------------------
 # 3. SIDEBAR - FILE UPLOAD & FILTERS
 # ---------------------------------------------------------
@@ -127,11 +576,47 @@ if uploaded_file is not None:
         top_n = st.sidebar.slider("Top Emojis to Show", 5, 50, 10)
 
         # Apply Filters
-        df_filt = df.copy()
-        if sel_festival != "All" and 'Festival' in df_filt.columns:
-            df_filt = df_filt[df_filt['Festival'] == sel_festival]
-        if sel_sentiment != "All" and 'Sentiment' in df_filt.columns:
-            df_filt = df_filt[df_filt['Sentiment'] == sel_sentiment]
+        # (one boolean mask instead of a df.copy() plus per-filter copies)
+        mask = pd.Series(True, index=df.index)
+        if sel_festival != "All" and 'Festival' in df.columns:
+            mask &= df['Festival'] == sel_festival
+        if sel_sentiment != "All" and 'Sentiment' in df.columns:
+            mask &= df['Sentiment'] == sel_sentiment
+        df_filt = df[mask] if not mask.all() else df
+
+        # Narrow frame of the columns the charts use, built from standalone Series
+        # (copy=False) so the charts don't copy the filtered frame, incl. Tweet_Text
+        chart_cols = {}
+        # Drop categories emptied by the filters so counts and legends only show present values
+        for col in df_filt.select_dtypes('category').columns:
+            chart_cols[col] = df_filt[col].cat.remove_unused_categories()
+        if 'Date' in df_filt.columns:
+            chart_cols['Date'] = df_filt['Date']
+            chart_cols['Date_only'] = df_filt['Date'].dt.normalize()
+        if LENGTH_COL in df_filt.columns:
+            chart_cols['Tweet_Length'] = df_filt[LENGTH_COL]
+        chart_df = pd.DataFrame(chart_cols, index=df_filt.index, copy=False)
+
+        # Single pass over the rows: counts per label/day combination, which the
+        # aggregate charts below re-sum instead of re-grouping the full frame
+        count_keys = [
+            col for col in ['Festival', 'Sentiment', 'Emotion', 'Emoji', 'Date_only']
+            if col in chart_df.columns
+        ]
+        combo_counts = (
+            chart_df
+            .groupby(count_keys, observed=True, dropna=False)
+            .size()
+            .reset_index(name='Count')
+        )
+
+        # Emoji frequencies and top-N list, shared by the KPIs, ranking, Sankey,
+        # co-occurrence and bubble charts (categorical value_counts bincounts the codes)
+        emoji_vc = pd.Series(dtype='int64')
+        top_emojis = []
+        if 'Emoji' in chart_df.columns:
+            emoji_vc = chart_df['Emoji'].value_counts()
+            top_emojis = emoji_vc.nlargest(top_n).index.tolist()
 
         # ---------------------------------------------------------
         # 4. MAIN DASHBOARD LAYOUT
@@ -141,20 +626,18 @@ if uploaded_file is not None:
 
         # --- A. KPI ROW ---
         c1, c2, c3, c4 = st.columns(4)
-        c1.metric("Total Tweets", len(df_filt))
+        c1.metric("Total Tweets", len(chart_df))
 
-        unique_emoji_count = df_filt['Emoji'].nunique() if 'Emoji' in df_filt.columns else 0
+        unique_emoji_count = len(emoji_vc)
         c2.metric("Unique Emojis", unique_emoji_count)
 
         top_emotion = "N/A"
-        if 'Emotion' in df_filt.columns and not df_filt['Emotion'].mode().empty:
-            top_emotion = df_filt['Emotion'].mode()[0]
+        if 'Emotion' in chart_df.columns and not chart_df['Emotion'].mode().empty:
+            top_emotion = chart_df['Emotion'].mode()[0]
         c3.metric("Top Emotion", top_emotion)
 
         # Top Emoji metric
-        top_emoji = "N/A"
-        if 'Emoji' in df_filt.columns and not df_filt['Emoji'].mode().empty:
-            top_emoji = df_filt['Emoji'].mode()[0]
+        top_emoji = top_emojis[0] if top_emojis else "N/A"
         c4.metric("Top Emoji", top_emoji)
 
         st.markdown("---")
@@ -164,47 +647,22 @@ if uploaded_file is not None:
 
         with col_left:
             st.subheader("📊 Emoji Frequency Ranking")
-            if 'Emoji' in df_filt.columns:
-                emoji_counts = (
-                    df_filt['Emoji']
-                    .value_counts()
-                    .nlargest(top_n)
-                    .reset_index()
-                )
+            if 'Emoji' in chart_df.columns:
+                emoji_counts = emoji_vc.nlargest(top_n).reset_index()
                 emoji_counts.columns = ['Emoji', 'Count']
-                
-                fig_bar = px.bar(
-                    emoji_counts,
-                    x='Count',
-                    y='Emoji',
-                    orientation='h',
-                    text='Count',
-                    color='Count',
-                    color_continuous_scale='Viridis'
-                )
-                fig_bar.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+
+                fig_bar = build_emoji_bar(emoji_counts)
                 st.plotly_chart(fig_bar, use_container_width=True)
             else:
                 st.warning("Column 'Emoji' not found in dataset.")
 
         with col_right:
             st.subheader("🍩 Sentiment Split")
-            if 'Sentiment' in df_filt.columns:
-                fig_pie = px.pie(
-                    df_filt,
-                    names='Sentiment',
-                    hole=0.5,
-                    color_discrete_sequence=px.colors.qualitative.Bold
-                )
-                fig_pie.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+            if 'Sentiment' in chart_df.columns:
+                sent_counts = chart_df['Sentiment'].value_counts().reset_index()
+                sent_counts.columns = ['Sentiment', 'Count']
+
+                fig_pie = build_sentiment_pie(sent_counts)
                 st.plotly_chart(fig_pie, use_container_width=True)
             else:
                 st.warning("Column 'Sentiment' not found.")
@@ -214,52 +672,32 @@ if uploaded_file is not None:
 
         with col3:
             st.subheader("☁️ Emotion Treemap")
-            if 'Emotion' in df_filt.columns and 'Emoji' in df_filt.columns:
+            if 'Emotion' in chart_df.columns and 'Emoji' in chart_df.columns:
                 tree_df = (
-                    df_filt
-                    .groupby(['Emotion', 'Emoji'])
-                    .size()
+                    combo_counts
+                    .groupby(['Emotion', 'Emoji'], observed=True)['Count']
+                    .sum()
                     .reset_index(name='Count')
+                    # treemap path columns must be plain labels, not categories
+                    .astype({'Emotion': str, 'Emoji': str})
                 )
-                fig_tree = px.treemap(
-                    tree_df,
-                    path=['Emotion', 'Emoji'],
-                    values='Count',
-                    color='Emotion'
-                )
-                fig_tree.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                fig_tree = build_emotion_treemap(tree_df)
                 st.plotly_chart(fig_tree, use_container_width=True)
             else:
                 st.warning("Required columns for Treemap missing.")
 
         with col4:
             st.subheader("📈 Tweet Trends (Time Series)")
-            if 'Date' in df_filt.columns:
+            if 'Date' in chart_df.columns:
                 daily = (
-                    df_filt
-                    .groupby(df_filt['Date'].dt.date)
-                    .size()
+                    combo_counts
+                    .groupby('Date_only')['Count']
+                    .sum()
                     .reset_index(name='Tweets')
                 )
-                daily.rename(columns={'Date': 'Date'}, inplace=True)
-
-                fig_line = px.line(
-                    daily,
-                    x='Date',
-                    y='Tweets',
-                    markers=True,
-                    line_shape='spline'
-                )
-                fig_line.update_traces(line_color='#F472B6', line_width=3)
-                fig_line.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                daily.rename(columns={'Date_only': 'Date'}, inplace=True)
+
+                fig_line = build_trend_line(daily)
                 st.plotly_chart(fig_line, use_container_width=True)
             else:
                 st.warning("Date column missing.")
@@ -276,11 +714,11 @@ if uploaded_file is not None:
         # 5A. Emoji vs Sentiment bar chart
         with extra_col1:
             st.markdown("#### 🔡 Emoji vs Sentiment (Bar)")
-            if 'Emoji' in df_filt.columns and 'Sentiment' in df_filt.columns:
+            if 'Emoji' in chart_df.columns and 'Sentiment' in chart_df.columns:
                 emoji_sent = (
-                    df_filt
-                    .groupby(['Emoji', 'Sentiment'])
-                    .size()
+                    combo_counts
+                    .groupby(['Emoji', 'Sentiment'], observed=True)['Count']
+                    .sum()
                     .reset_index(name='Count')
                 )
                 emoji_sent_top = (
@@ -289,18 +727,7 @@ if uploaded_file is not None:
                     .head(top_n * 3)
                 )
 
-                fig_emoji_sent = px.bar(
-                    emoji_sent_top,
-                    x='Emoji',
-                    y='Count',
-                    color='Sentiment',
-                    barmode='group'
-                )
-                fig_emoji_sent.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                fig_emoji_sent = build_emoji_sentiment_bar(emoji_sent_top)
                 st.plotly_chart(fig_emoji_sent, use_container_width=True)
             else:
                 st.info("Need both 'Emoji' and 'Sentiment' columns for this chart.")
@@ -308,45 +735,27 @@ if uploaded_file is not None:
         # 5B. Violin plot: Tweet length by Sentiment
         with extra_col2:
             st.markdown("#### 🎻 Tweet Length Distribution (Violin)")
-            if 'Tweet_Text' in df_filt.columns and 'Sentiment' in df_filt.columns:
-                temp = df_filt.copy()
-                temp['Tweet_Length'] = temp['Tweet_Text'].astype(str).str.len()
-
-                fig_violin = px.violin(
-                    temp,
-                    x='Sentiment',
-                    y='Tweet_Length',
-                    color='Sentiment',
-                    box=True,
-                    points='all'
-                )
-                fig_violin.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+            if 'Tweet_Length' in chart_df.columns and 'Sentiment' in chart_df.columns:
+                fig_violin = build_length_violin(chart_df[['Sentiment', 'Tweet_Length']])
                 st.plotly_chart(fig_violin, use_container_width=True)
             else:
                 st.info("Need 'Tweet_Text' and 'Sentiment' columns for violin plot.")
 
         # 5C. Scatter plot: Time vs Emoji
         st.markdown("#### ✨ Emoji Activity Over Time (Scatter)")
-        if 'Date' in df_filt.columns and 'Emoji' in df_filt.columns:
-            scat_df = df_filt.copy()
-            scat_df['Date_only'] = scat_df['Date'].dt.date
-
-            fig_scatter = px.scatter(
-                scat_df,
-                x='Date_only',
-                y='Emoji',
-                color='Sentiment' if 'Sentiment' in scat_df.columns else None,
-                size_max=8
-            )
-            fig_scatter.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
+        if 'Date' in chart_df.columns and 'Emoji' in chart_df.columns:
+            # One marker per (day, emoji[, sentiment]) sized by count instead of one per tweet
+            scat_keys = ['Date_only', 'Emoji']
+            if 'Sentiment' in chart_df.columns:
+                scat_keys.append('Sentiment')
+            scat_agg = (
+                combo_counts
+                .groupby(scat_keys, observed=True)['Count']
+                .sum()
+                .reset_index(name='Count')
             )
+
+            fig_scatter = build_activity_scatter(scat_agg)
             st.plotly_chart(fig_scatter, use_container_width=True)
         else:
             st.info("Need 'Date' and 'Emoji' for scatter plot.")
@@ -363,32 +772,16 @@ if uploaded_file is not None:
         # 6A. Radar Chart (Spider Plot) – Avg tweet length by sentiment
         with adv_col1:
             st.markdown("#### 🕸️ Radar Chart: Tweet Length vs Sentiment")
-            if 'Tweet_Text' in df_filt.columns and 'Sentiment' in df_filt.columns:
-                radar_df = df_filt.copy()
-                radar_df['Tweet_Length'] = radar_df['Tweet_Text'].astype(str).str.len()
+            if 'Tweet_Length' in chart_df.columns and 'Sentiment' in chart_df.columns:
                 agg_radar = (
-                    radar_df
-                    .groupby('Sentiment')['Tweet_Length']
-                    .mean()
+                    chart_df
+                    .groupby('Sentiment', observed=True)['Tweet_Length']
+                    .mean()  # skips missing lengths
+                    .astype(float)
                     .reset_index()
                 )
 
-                fig_radar = px.line_polar(
-                    agg_radar,
-                    r='Tweet_Length',
-                    theta='Sentiment',
-                    line_close=True
-                )
-                fig_radar.update_traces(fill='toself')
-                fig_radar.update_layout(
-                    polar=dict(
-                        radialaxis=dict(visible=True)
-                    ),
-                    showlegend=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                fig_radar = build_length_radar(agg_radar)
                 st.plotly_chart(fig_radar, use_container_width=True)
             else:
                 st.info("Need 'Tweet_Text' and 'Sentiment' for radar chart.")
@@ -396,67 +789,27 @@ if uploaded_file is not None:
         # 6B. Stacked Area Chart – Tweets per sentiment over time
         with adv_col2:
             st.markdown("#### 🏔️ Stacked Area: Sentiment Over Time")
-            if 'Date' in df_filt.columns and 'Sentiment' in df_filt.columns:
-                area_df = df_filt.copy()
-                area_df['Date_only'] = area_df['Date'].dt.date
+            if 'Date' in chart_df.columns and 'Sentiment' in chart_df.columns:
                 area_agg = (
-                    area_df
-                    .groupby(['Date_only', 'Sentiment'])
-                    .size()
+                    combo_counts
+                    .groupby(['Date_only', 'Sentiment'], observed=True)['Count']
+                    .sum()
                     .reset_index(name='Tweets')
                 )
 
-                fig_area = px.area(
-                    area_agg,
-                    x='Date_only',
-                    y='Tweets',
-                    color='Sentiment',
-                    line_group='Sentiment',
-                    groupnorm=None
-                )
-                fig_area.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                fig_area = build_sentiment_area(area_agg)
                 st.plotly_chart(fig_area, use_container_width=True)
             else:
                 st.info("Need 'Date' and 'Sentiment' for stacked area chart.")
 
         # 6C. Gauge Chart – % Positive tweets
         st.markdown("#### 🚀 Sentiment Gauge (Speedometer)")
-        if 'Sentiment' in df_filt.columns and len(df_filt) > 0:
-            total = len(df_filt)
-            positive_count = (df_filt['Sentiment'] == 'Positive').sum()
-            positive_rate = (positive_count / total) * 100
-
-            fig_gauge = go.Figure(
-                go.Indicator(
-                    mode="gauge+number",
-                    value=positive_rate,
-                    title={'text': "Positive Tweets (%)"},
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    gauge={
-                        "axis": {"range": [0, 100]},
-                        "bar": {"color": "#8B5CF6"},
-                        "steps": [
-                            {"range": [0, 30], "color": "#DC2626"},
-                            {"range": [30, 60], "color": "#F59E0B"},
-                            {"range": [60, 100], "color": "#16A34A"},
-                        ],
-                        "threshold": {
-                            "line": {"color": "white", "width": 4},
-                            "thickness": 0.75,
-                            "value": positive_rate,
-                        },
-                    },
-                )
-            )
-            fig_gauge.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
+        if 'Sentiment' in chart_df.columns and len(chart_df) > 0:
+            # Counted over the category codes rather than a full-length boolean mask
+            sentiment_counts = chart_df['Sentiment'].value_counts(dropna=False)
+            positive_rate = 100.0 * sentiment_counts.get('Positive', 0) / sentiment_counts.sum()
+
+            fig_gauge = build_positive_gauge(float(positive_rate))
             st.plotly_chart(fig_gauge, use_container_width=True)
         else:
             st.info("Need 'Sentiment' column for gauge chart.")
@@ -473,79 +826,12 @@ if uploaded_file is not None:
         # 7A. Sankey Diagram: Festival -> Sentiment -> Emoji
         with flow_col1:
             st.markdown("#### 🌉 Sankey Diagram: Festival → Sentiment → Emoji")
-            if 'Festival' in df_filt.columns and 'Sentiment' in df_filt.columns and 'Emoji' in df_filt.columns:
+            if 'Festival' in chart_df.columns and 'Sentiment' in chart_df.columns and 'Emoji' in chart_df.columns:
                 # Build nodes: Festivals, Sentiments, Top Emojis
-                top_emojis_global = (
-                    df_filt['Emoji']
-                    .value_counts()
-                    .nlargest(top_n)
-                    .index
-                    .tolist()
-                )
-                sankey_df = df_filt[df_filt['Emoji'].isin(top_emojis_global)].copy()
-
-                festivals = sankey_df['Festival'].dropna().unique().tolist()
-                sentiments = sankey_df['Sentiment'].dropna().unique().tolist()
-                emojis = top_emojis_global
+                sankey_counts = combo_counts[combo_counts['Emoji'].isin(top_emojis)]
 
-                labels = festivals + sentiments + emojis
-                label_to_idx = {lab: i for i, lab in enumerate(labels)}
-
-                # Links: Festival -> Sentiment
-                fs = (
-                    sankey_df
-                    .groupby(['Festival', 'Sentiment'])
-                    .size()
-                    .reset_index(name='Count')
-                )
-                # Links: Sentiment -> Emoji
-                se = (
-                    sankey_df
-                    .groupby(['Sentiment', 'Emoji'])
-                    .size()
-                    .reset_index(name='Count')
-                )
-
-                sources = []
-                targets = []
-                values = []
-
-                # F → S
-                for _, row in fs.iterrows():
-                    if row['Festival'] in label_to_idx and row['Sentiment'] in label_to_idx:
-                        sources.append(label_to_idx[row['Festival']])
-                        targets.append(label_to_idx[row['Sentiment']])
-                        values.append(row['Count'])
-
-                # S → E
-                for _, row in se.iterrows():
-                    if row['Sentiment'] in label_to_idx and row['Emoji'] in label_to_idx:
-                        sources.append(label_to_idx[row['Sentiment']])
-                        targets.append(label_to_idx[row['Emoji']])
-                        values.append(row['Count'])
-
-                if len(sources) > 0:
-                    fig_sankey = go.Figure(
-                        go.Sankey(
-                            node=dict(
-                                label=labels,
-                                pad=15,
-                                thickness=20,
-                                color="#4B5563"
-                            ),
-                            link=dict(
-                                source=sources,
-                                target=targets,
-                                value=values,
-                                color="rgba(139,92,246,0.5)"
-                            )
-                        )
-                    )
-                    fig_sankey.update_layout(
-                        font=dict(color='white'),
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)'
-                    )
+                fig_sankey = build_sankey(sankey_counts, tuple(top_emojis))
+                if fig_sankey is not None:
                     st.plotly_chart(fig_sankey, use_container_width=True)
                 else:
                     st.info("Not enough data to draw Sankey.")
@@ -555,39 +841,10 @@ if uploaded_file is not None:
         # 7B. Emoji Co-occurrence Matrix (Correlation Heatmap)
         with flow_col2:
             st.markdown("#### 🧩 Emoji Co-occurrence Matrix (Heatmap)")
-            if 'Emoji' in df_filt.columns:
+            if 'Emoji' in chart_df.columns:
                 # For simplicity, treat each row as one emoji (if multiple emojis per tweet, you can expand).
                 # Build co-occurrence on top N emojis.
-                top_emojis = (
-                    df_filt['Emoji']
-                    .value_counts()
-                    .nlargest(top_n)
-                    .index
-                    .tolist()
-                )
-
-                # Build a tweet-emoji occurrence matrix
-                # 1 if tweet uses that emoji (here exactly one, but generic structure).
-                mat_df = pd.DataFrame(0, index=df_filt.index, columns=top_emojis)
-                for e in top_emojis:
-                    mat_df[e] = (df_filt['Emoji'] == e).astype(int)
-
-                # Correlation matrix
-                corr_mat = mat_df.corr()
-
-                fig_corr = px.imshow(
-                    corr_mat,
-                    x=top_emojis,
-                    y=top_emojis,
-                    color_continuous_scale="PuRd",
-                    zmin=-1,
-                    zmax=1
-                )
-                fig_corr.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                fig_corr = build_cooccurrence_heatmap(chart_df['Emoji'], tuple(top_emojis))
                 st.plotly_chart(fig_corr, use_container_width=True)
             else:
                 st.info("Need 'Emoji' column for co-occurrence heatmap.")
@@ -604,43 +861,18 @@ if uploaded_file is not None:
         # 8A. Animated Bubble Chart: Emoji popularity over time
         with time_col1:
             st.markdown("#### 🌌 Animated Bubble Chart: Emoji Popularity Over Time")
-            if 'Date' in df_filt.columns and 'Emoji' in df_filt.columns:
-                anim_df = df_filt.copy()
-                anim_df['Date_only'] = anim_df['Date'].dt.date
-
+            if 'Date' in chart_df.columns and 'Emoji' in chart_df.columns:
                 agg_anim = (
-                    anim_df
-                    .groupby(['Date_only', 'Emoji'])
-                    .size()
+                    combo_counts
+                    .groupby(['Date_only', 'Emoji'], observed=True)['Count']
+                    .sum()
                     .reset_index(name='Count')
                 )
 
                 # restrict to top_n emojis overall for clarity
-                overall_top = (
-                    agg_anim.groupby('Emoji')['Count']
-                    .sum()
-                    .sort_values(ascending=False)
-                    .head(top_n)
-                    .index
-                    .tolist()
-                )
-                agg_anim = agg_anim[agg_anim['Emoji'].isin(overall_top)]
-
-                fig_bubble = px.scatter(
-                    agg_anim,
-                    x='Date_only',
-                    y='Emoji',
-                    size='Count',
-                    color='Emoji',
-                    animation_frame='Date_only',
-                    size_max=20
-                )
-                fig_bubble.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white'),
-                    updatemenus=[dict(bgcolor="#111827")]
-                )
+                agg_anim = agg_anim[agg_anim['Emoji'].isin(top_emojis)]
+
+                fig_bubble = build_emoji_bubble(agg_anim)
                 st.plotly_chart(fig_bubble, use_container_width=True)
             else:
                 st.info("Need 'Date' and 'Emoji' for animated bubble chart.")
@@ -648,35 +880,17 @@ if uploaded_file is not None:
         # 8B. Calendar Heatmap (GitHub Style-ish)
         with time_col2:
             st.markdown("#### 📅 Calendar Heatmap (GitHub Style)")
-            if 'Date' in df_filt.columns:
-                cal_df = df_filt.copy()
-                cal_df['date'] = cal_df['Date'].dt.date
+            if 'Date' in chart_df.columns:
                 cal_agg = (
-                    cal_df
-                    .groupby('date')
-                    .size()
+                    combo_counts
+                    .groupby('Date_only')['Count']
+                    .sum()
                     .reset_index(name='Tweets')
                 )
-                cal_agg['dow'] = pd.to_datetime(cal_agg['date']).dt.weekday  # 0=Mon
-                cal_agg['week'] = pd.to_datetime(cal_agg['date']).dt.isocalendar().week
-
-                fig_cal = px.density_heatmap(
-                    cal_agg,
-                    x='week',
-                    y='dow',
-                    z='Tweets',
-                    color_continuous_scale="Greens"
-                )
-                fig_cal.update_yaxes(
-                    tickmode='array',
-                    tickvals=[0, 1, 2, 3, 4, 5, 6],
-                    ticktext=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                )
-                fig_cal.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
+                cal_agg['dow'] = cal_agg['Date_only'].dt.weekday  # 0=Mon
+                cal_agg['week'] = cal_agg['Date_only'].dt.isocalendar().week
+
+                fig_cal = build_calendar_heatmap(cal_agg)
                 st.plotly_chart(fig_cal, use_container_width=True)
             else:
                 st.info("Need 'Date' column for calendar heatmap.")
@@ -685,7 +899,17 @@ if uploaded_file is not None:
 
         # --- RAW DATA TABLE ---
         with st.expander("🔍 Inspect Raw Data (Live Feed)"):
-            st.dataframe(df_filt, use_container_width=True)
+            raw_cols = [col for col in df_filt.columns if col != LENGTH_COL]
+            st.dataframe(df_filt.head(RAW_PREVIEW_ROWS)[raw_cols], use_container_width=True)
+            st.caption(f"Showing first {min(len(df_filt), RAW_PREVIEW_ROWS)} of {len(df_filt)} rows")
+            # Expander bodies run on every rerun, so the CSV is only built on request
+            if st.checkbox("Prepare CSV download"):
+                st.download_button(
+                    "⬇️ Download filtered data (CSV)",
+                    data=to_csv_bytes(df_filt, raw_cols),
+                    file_name="filtered_tweets.csv",
+                    mime="text/csv"
+                )
 
 else:
     # ---------------------------------------------------------